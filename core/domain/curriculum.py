@@ -1,8 +1,8 @@
 from typing import List, Dict, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Course:
     """Represents a single course within a curriculum."""
 
@@ -11,7 +11,7 @@ class Course:
     semester: int
     credits: int
     is_compulsory: bool
-    prerequisites: List[str]
+    prerequisites: List[str] = field(hash=False)
     description: Optional[str] = None
     workload_hours: int = 0
 
@@ -28,31 +28,59 @@ class ProgramCurriculum:
     total_credits: int
     duration_semesters: int
 
+    def __post_init__(self):
+        self.reindex()
+
+    def reindex(self) -> None:
+        """
+        Rebuilds the lookup indexes over `courses`.
+
+        Must be called after mutating `courses` in place.
+        """
+        self._by_id: Dict[str, Course] = {}
+        self._by_sem: Dict[int, List[Course]] = {}
+        self._compulsory_by_sem: Dict[int, List[Course]] = {}
+        self._electives_by_sem: Dict[int, List[Course]] = {}
+        self._electives: List[Course] = []
+        self._credits_by_sem: Dict[int, int] = {}
+        self._workload_by_sem: Dict[int, int] = {}
+
+        for course in self.courses:
+            # Keep the first occurrence, matching the previous linear scan
+            self._by_id.setdefault(course.id, course)
+
+            semester = course.semester
+            self._by_sem.setdefault(semester, []).append(course)
+            if course.is_compulsory:
+                self._compulsory_by_sem.setdefault(semester, []).append(course)
+            else:
+                self._electives_by_sem.setdefault(semester, []).append(course)
+                self._electives.append(course)
+
+            self._credits_by_sem[semester] = (
+                self._credits_by_sem.get(semester, 0) + course.credits
+            )
+            self._workload_by_sem[semester] = (
+                self._workload_by_sem.get(semester, 0) + course.workload_hours
+            )
+
     def get_electives(self) -> List[Course]:
         """Returns a list of all elective courses in the program."""
-        return [course for course in self.courses if not course.is_compulsory]
+        return list(self._electives)
 
     def get_courses_by_semester(self, semester: int) -> List[Course]:
         """Returns a list of all courses offered in a specific semester."""
-        return [course for course in self.courses if course.semester == semester]
+        return list(self._by_sem.get(semester, ()))
 
     def get_compulsory_courses_by_semester(self, semester: int) -> List[Course]:
         """
         Returns a list of compulsory courses for a specific semester.
         """
-        return [
-            course
-            for course in self.courses
-            if course.is_compulsory and course.semester == semester
-        ]
+        return list(self._compulsory_by_sem.get(semester, ()))
 
     def get_electives_by_semester(self, semester: int) -> List[Course]:
         """Returns a list of elective courses for a specific semester."""
-        return [
-            course
-            for course in self.courses
-            if not course.is_compulsory and course.semester == semester
-        ]
+        return list(self._electives_by_sem.get(semester, ()))
 
     def find_course_by_id(self, course_id: str) -> Optional[Course]:
         """
@@ -61,17 +89,12 @@ class ProgramCurriculum:
         Returns:
             The Course object if found, otherwise None.
         """
-        for course in self.courses:
-            if course.id == course_id:
-                return course
-        return None
+        return self._by_id.get(course_id)
 
     def get_semester_credits(self, semester: int) -> int:
         """Calculates the total number of credits for all courses in a given semester."""
-        courses_in_semester = self.get_courses_by_semester(semester)
-        return sum(course.credits for course in courses_in_semester)
+        return self._credits_by_sem.get(semester, 0)
 
     def get_semester_workload(self, semester: int) -> int:
         """Calculates the total workload in hours for all courses in a given semester."""
-        courses_in_semester = self.get_courses_by_semester(semester)
-        return sum(course.workload_hours for course in courses_in_semester)
+        return self._workload_by_sem.get(semester, 0)
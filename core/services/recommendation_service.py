@@ -1,7 +1,14 @@
+import functools
+import heapq
 import yaml
 import re
-from typing import List, Dict, Set
-import pymorphy3
+from collections import defaultdict
+from typing import List, Dict, Set, Tuple
+
+try:
+    import Stemmer  # PyStemmer, optional fast normalizer
+except ImportError:
+    Stemmer = None
 
 from core.domain.curriculum import Course, ProgramCurriculum
 
@@ -10,10 +17,14 @@ class RecommendationService:
     """
     Provides course recommendation and personalized study plan generation.
 
-    This service uses a keyword-based approach with lemmatization to match
-    courses against a student's background skills.
+    This service uses a keyword-based approach with word normalization to match
+    courses against a student's background skills. Words are stemmed with the
+    Snowball Russian stemmer when PyStemmer is installed, and lemmatized with
+    pymorphy3 otherwise.
     """
 
+    _WORD_RE = re.compile(r"\w+", re.UNICODE)
+
     def __init__(
         self,
         curricula: Dict[str, ProgramCurriculum],
@@ -27,17 +38,70 @@ class RecommendationService:
             config_path (str): Path to the YAML configuration file containing knowledge area keywords.
         """
         self.curricula = curricula
-        self.morph = pymorphy3.MorphAnalyzer()
+        if Stemmer is not None:
+            # Matching only needs consistent normalization, not true lemmas
+            self._stemmer = Stemmer.Stemmer("russian")
+            self.morph = None
+        else:
+            # Only needed without PyStemmer, so import it lazily
+            import pymorphy3
+
+            self._stemmer = None
+            self.morph = pymorphy3.MorphAnalyzer()
 
         # Load keywords from the external config file
         self.knowledge_areas = self._load_config(config_path)
 
+        # Word -> normal form table. Keywords and course names are all known
+        # up front and get normalized below, so every distinct word is
+        # processed exactly once and later lookups are plain dict hits
+        self._lemma_cache: Dict[str, str] = {}
+
         # Pre-process keywords into lemmatized sets for efficient matching
         self.lemmatized_areas = {
             area: {self._normalize_word(kw) for kw in keywords}
             for area, keywords in self.knowledge_areas.items()
         }
 
+        # Inverted index: lemma -> areas it belongs to, so scoring a course
+        # is a single pass over its words instead of a scan over all areas
+        self._lemma_to_areas: Dict[str, List[str]] = defaultdict(list)
+        for area, lemmas in self.lemmatized_areas.items():
+            for lemma in lemmas:
+                self._lemma_to_areas[lemma].append(area)
+
+        # Course names never change, so lemmatize them once up front.
+        # Keyed by name: parsed course ids are row numbers and may repeat.
+        self._course_tokens: Dict[str, Set[str]] = {
+            course.name: self._normalize_text_to_set(course.name)
+            for program in curricula.values()
+            for course in program.courses
+        }
+
+        # Areas matched by each course name are fixed too, so resolve them
+        # once; per-call scoring then only sums the user's area scores
+        self._course_areas: Dict[str, Tuple[str, ...]] = {
+            name: self._match_areas(words)
+            for name, words in self._course_tokens.items()
+        }
+
+        # Electives matching no knowledge area can never score, so drop them
+        # from each program's candidate list instead of re-checking per call
+        self._scorable_electives: Dict[str, List[Course]] = {
+            program_id: [
+                course
+                for course in program.get_electives()
+                if self._course_areas[course.name]
+            ]
+            for program_id, program in curricula.items()
+        }
+
+        # Identical requests recur across users; cache results per instance
+        # so the cache lives and dies with this service's curricula
+        self._recommend_cached = functools.lru_cache(maxsize=1024)(
+            self._recommend_electives_impl
+        )
+
     def _load_config(self, path: str) -> Dict[str, List[str]]:
         """Loads knowledge areas from a YAML file."""
         try:
@@ -48,15 +112,33 @@ class RecommendationService:
             # Handle case where config is missing, you might want to log a warning
             raise FileNotFoundError(f"Config file not found at {path}")
 
+    def _norm(self, word: str) -> str:
+        """Returns the cached normal form of a lowercased word, computing it on a miss."""
+        lemma = self._lemma_cache.get(word)
+        if lemma is None:
+            if self._stemmer is not None:
+                lemma = self._stemmer.stemWord(word)
+            else:
+                lemma = self.morph.parse(word)[0].normal_form
+            self._lemma_cache[word] = lemma
+        return lemma
+
     def _normalize_word(self, word: str) -> str:
         """Converts a word to its base (normal) form."""
-        return self.morph.parse(word.lower())[0].normal_form
+        return self._norm(word.lower())
 
     def _normalize_text_to_set(self, text: str) -> Set[str]:
         """Normalizes a string of text into a set of its base form words."""
-        # Remove punctuation, split into words, and normalize each word
-        clean_text = re.sub(r"[^\w\s]", "", text.lower())
-        return {self._normalize_word(word) for word in clean_text.split()}
+        # Extract words in a single pass and normalize each word
+        return {self._norm(word) for word in self._WORD_RE.findall(text.lower())}
+
+    def _match_areas(self, words: Set[str]) -> Tuple[str, ...]:
+        """Returns the knowledge areas whose keywords occur among the given words."""
+        # Collect each matched area once, however many of its keywords hit
+        matched_areas = set()
+        for word in words:
+            matched_areas.update(self._lemma_to_areas.get(word, ()))
+        return tuple(sorted(matched_areas))
 
     def recommend_electives(
         self,
@@ -79,38 +161,48 @@ class RecommendationService:
         Returns:
             List[Course]: A sorted list of recommended elective courses.
         """
+        bg_key = tuple(sorted(background.items()))
+        return list(self._recommend_cached(program_id, bg_key, max_courses, strategy))
+
+    def _recommend_electives_impl(
+        self,
+        program_id: str,
+        bg_key: Tuple[Tuple[str, int], ...],
+        max_courses: int,
+        strategy: str,
+    ) -> Tuple[Course, ...]:
+        """
+        Computes elective recommendations from hashable inputs.
+
+        Backs the per-instance LRU cache used by `recommend_electives`;
+        `bg_key` is the background dictionary as a sorted tuple of items.
+        """
+        background = dict(bg_key)
         program = self.curricula.get(program_id)
         if not program:
-            return []
+            return ()
 
-        electives = program.get_electives()
+        if strategy not in ("deepen", "broaden"):
+            raise ValueError(f"Unknown recommendation strategy: {strategy}")
+        # 'deepen' reinforces strengths; 'broaden' shores up weaknesses
+        # (score is higher for weaker areas)
+        deepen = strategy == "deepen"
 
         scored_courses = []
-        for course in electives:
+        for course in self._scorable_electives[program_id]:
             score = 0
-            course_words = self._normalize_text_to_set(course.name)
-
-            for area, lemmatized_keywords in self.lemmatized_areas.items():
-                # Check for any matching keywords efficiently using set intersection
-                if not lemmatized_keywords.isdisjoint(course_words):
-                    user_score = background.get(area, 0)
-                    if strategy == "deepen":
-                        # Reinforce strengths
-                        score += user_score
-                    elif strategy == "broaden":
-                        # Shore up weaknesses (score is higher for weaker areas)
-                        score += 5 - user_score
-                    else:
-                        raise ValueError(f"Unknown recommendation strategy: {strategy}")
+            for area in self._course_areas[course.name]:
+                user_score = background.get(area, 0)
+                score += user_score if deepen else 5 - user_score
 
             if score > 0:
                 scored_courses.append((course, score))
 
-        # Sort by the calculated score in descending order
-        scored_courses.sort(key=lambda x: x[1], reverse=True)
+        # Select the highest-scored courses without sorting the whole list
+        top_courses = heapq.nlargest(max_courses, scored_courses, key=lambda x: x[1])
 
-        # Return only the course objects from the sorted list
-        return [course for course, score in scored_courses][:max_courses]
+        # Return only the course objects, best first
+        return tuple(course for course, score in top_courses)
 
     def get_study_plan(
         self, program_id: str, background: Dict[str, int], strategy: str = "deepen"
@@ -138,16 +230,18 @@ class RecommendationService:
             strategy=strategy,  # Get more to fill semesters
         )
 
+        # Group the recommended electives by semester in a single pass
+        electives_by_sem: Dict[int, List[Course]] = defaultdict(list)
+        for elective in recommended_electives:
+            electives_by_sem[elective.semester].append(elective)
+
         plan = {}
         for semester in range(1, program.duration_semesters + 1):
             # 1. Start with this semester's compulsory courses
-            # ASSUMPTION: Your ProgramCurriculum class has a method to get ONLY compulsory courses.
             semester_courses = program.get_compulsory_courses_by_semester(semester)
 
             # 2. Add the recommended electives that belong to this semester
-            for elective in recommended_electives:
-                if elective.semester == semester:
-                    semester_courses.append(elective)
+            semester_courses.extend(electives_by_sem.get(semester, ()))
 
             plan[semester] = semester_courses
 
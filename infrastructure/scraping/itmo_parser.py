@@ -1,77 +1,199 @@
+import asyncio
+import dataclasses
+import hashlib
+import logging
+import os
+import pickle
 import re
+import tempfile
 from io import BytesIO
-from typing import Dict, List
+from typing import Any, Coroutine, Dict, Iterator, List, Optional, Tuple, TypeVar
 
+import httpx
 import PyPDF2
-import requests
 from bs4 import BeautifulSoup
 
 from core.domain.curriculum import Course, ProgramCurriculum
 
+T = TypeVar("T")
+
+# Repository-root cache directory, independent of the working directory
+DEFAULT_CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "cache",
+)
+
 
 class ItmoParser:
     BASE_URL = "https://abit.itmo.ru"
 
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update(
-            {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-            }
-        )
+    PROGRAMS = {
+        "ai": ("https://abit.itmo.ru/program/master/ai", "AI"),
+        "ai_product": ("https://abit.itmo.ru/program/master/ai_product", "AI Product"),
+    }
+
+    _PROGRAM_RE = re.compile(r"ОП\s+(.+)")
+    _SEMESTER_RE = re.compile(r"(\d+)\s+семестр")
+    _COURSE_RE = re.compile(r"^(\d+)([^\d].+?)\s+(\d+)$")
+    _PLAN_RE = re.compile(r'"academic_plan"\s*:\s*"([^"]+)"')
+
+    # Bump whenever parsing logic or the cached row format changes, so stale
+    # cache entries are ignored instead of served after an upgrade
+    _CACHE_VERSION = 1
+
+    # httpx defaults to 5 seconds; curriculum PDFs can be slow to serve, so
+    # stay close to the previous no-timeout behavior while still bounding hangs
+    HTTP_TIMEOUT = httpx.Timeout(120.0, connect=30.0)
+
+    HEADERS = {
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+    }
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
 
     def parse_program(self, program_url: str, program_name: str) -> ProgramCurriculum:
         """Parse curriculum from program page"""
-        response = self.session.get(program_url)
-        response.raise_for_status()
 
-        # Find academic_plan URL from JSON data
-        academic_plan_pattern = r'"academic_plan"\s*:\s*"([^"]+)"'
-        match = re.search(academic_plan_pattern, response.text)
-        if not match:
-            raise ValueError(f"Academic plan URL not found at {program_url}")
+        async def fetch() -> ProgramCurriculum:
+            async with self._make_client() as client:
+                return await self.parse_program_async(client, program_url, program_name)
 
-        pdf_url = match.group(1)
-        pdf_response = self.session.get(pdf_url)
+        return self._run_sync(fetch())
+
+    @staticmethod
+    def _run_sync(coro: Coroutine[Any, Any, T]) -> T:
+        """
+        Run a coroutine to completion on a private event loop.
+
+        Unlike asyncio.run, this leaves the calling thread's current event loop
+        untouched, so python-telegram-bot can still obtain it in run_polling.
+        """
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(coro)
+        finally:
+            try:
+                loop.run_until_complete(loop.shutdown_asyncgens())
+                loop.run_until_complete(loop.shutdown_default_executor())
+            finally:
+                loop.close()
+
+    def _make_client(self) -> httpx.AsyncClient:
+        """Create an HTTP client configured for abit.itmo.ru"""
+        return httpx.AsyncClient(
+            headers=self.HEADERS, follow_redirects=True, timeout=self.HTTP_TIMEOUT
+        )
+
+    async def parse_program_async(
+        self, client: httpx.AsyncClient, program_url: str, program_name: str
+    ) -> ProgramCurriculum:
+        """Parse curriculum from program page without blocking the event loop"""
+        response = await client.get(program_url)
+        response.raise_for_status()
+
+        pdf_url = self._find_academic_plan_url(response.text, program_url)
+        pdf_response = await client.get(pdf_url)
         pdf_response.raise_for_status()
 
-        return self.parse_pdf_curriculum(
+        # PDF text extraction is CPU-bound, keep it off the event loop
+        return await asyncio.to_thread(
+            self._parse_pdf_cached,
             pdf_content=pdf_response.content,
             program_name=program_name,
         )
 
+    def _find_academic_plan_url(self, page_text: str, program_url: str) -> str:
+        """Find academic_plan URL from JSON data embedded in the program page"""
+        match = self._PLAN_RE.search(page_text)
+        if not match:
+            raise ValueError(f"Academic plan URL not found at {program_url}")
+        return match.group(1)
+
+    def _parse_pdf_cached(
+        self, pdf_content: bytes, program_name: str
+    ) -> ProgramCurriculum:
+        """Parse curriculum from PDF content, reusing cached rows for identical input"""
+        digest = hashlib.blake2b(pdf_content, digest_size=16)
+        digest.update(program_name.encode("utf-8"))
+        digest.update(str(self._CACHE_VERSION).encode("ascii"))
+        cache_path = os.path.join(self.cache_dir, f"{digest.hexdigest()}.pkl")
+
+        # Only plain parsed rows are cached; the curriculum and its indexes
+        # are always rebuilt through the regular constructor
+        try:
+            with open(cache_path, "rb") as f:
+                cached_name, rows = pickle.load(f)
+            return self._build_curriculum(cached_name, [Course(**row) for row in rows])
+        except FileNotFoundError:
+            pass
+        except (OSError, pickle.UnpicklingError, EOFError, TypeError, ValueError) as e:
+            logging.warning(
+                "Ignoring unreadable curriculum cache %s: %s", cache_path, e
+            )
+
+        parsed_name, courses = self._parse_pdf_rows(
+            pdf_content=pdf_content, program_name=program_name
+        )
+        rows: List[Dict[str, Any]] = [dataclasses.asdict(c) for c in courses]
+
+        # Write atomically so a crash never leaves a truncated cache entry
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    pickle.dump(
+                        (parsed_name, rows), f, protocol=pickle.HIGHEST_PROTOCOL
+                    )
+                os.replace(tmp_path, cache_path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            logging.warning("Could not write curriculum cache %s: %s", cache_path, e)
+
+        return self._build_curriculum(parsed_name, courses)
+
+    @staticmethod
+    def _iter_lines(reader: PyPDF2.PdfReader) -> Iterator[str]:
+        """Yield text lines page by page without building the full document text"""
+        for page in reader.pages:
+            yield from page.extract_text().split("\n")
+
     def parse_pdf_curriculum(
         self, pdf_content: bytes, program_name: str
     ) -> ProgramCurriculum:
         """Parse curriculum from PDF content"""
-        courses = []
+        return self._build_curriculum(
+            *self._parse_pdf_rows(pdf_content=pdf_content, program_name=program_name)
+        )
+
+    def _parse_pdf_rows(
+        self, pdf_content: bytes, program_name: str
+    ) -> Tuple[str, List[Course]]:
+        """Parse the program name and course rows from PDF content"""
         pdf_file = BytesIO(pdf_content)
         reader = PyPDF2.PdfReader(pdf_file)
 
-        # Extract text from all pages
-        full_text = ""
-        for page in reader.pages:
-            full_text += page.extract_text() + "\n"
-
-        # Split text into lines
-        lines = full_text.split("\n")
         current_semester = None
         current_category = None
         courses = []
 
-        for line in lines:
+        for line in self._iter_lines(reader):
             line = line.strip()
 
             # Detect program name
             if "ОП" in line:
-                program_match = re.search(r"ОП\s+(.+)", line)
+                program_match = self._PROGRAM_RE.search(line)
                 if program_match:
                     program_name = program_match.group(1).strip()
 
             # Detect semester
-            semester_match = re.search(r"(\d+)\s+семестр", line)
-            if semester_match:
-                current_semester = int(semester_match.group(1))
+            if "семестр" in line:
+                semester_match = self._SEMESTER_RE.search(line)
+                if semester_match:
+                    current_semester = int(semester_match.group(1))
 
             # Detect category (compulsory/elective)
             if "Обязательные" in line:
@@ -80,9 +202,9 @@ class ItmoParser:
                 current_category = "elective"
 
             # Parse course lines
-            if current_semester and current_category:
+            if current_semester and current_category and line[:1].isdigit():
                 # Match lines like: "1Воркшоп по созданию продукта на данных / Data Product Development Workshop 3108"
-                course_match = re.search(r"^(\d+)([^\d].+?)\s+(\d+)$", line)
+                course_match = self._COURSE_RE.search(line)
                 if course_match:
                     course_code = course_match.group(1)
                     course_name = course_match.group(2).strip()
@@ -106,6 +228,13 @@ class ItmoParser:
         if not courses:
             raise ValueError("No courses found in PDF curriculum")
 
+        return program_name, courses
+
+    @staticmethod
+    def _build_curriculum(
+        program_name: str, courses: List[Course]
+    ) -> ProgramCurriculum:
+        """Assemble a curriculum from parsed course rows"""
         return ProgramCurriculum(
             program_name=program_name,
             courses=courses,
@@ -115,9 +244,15 @@ class ItmoParser:
 
     def get_all_programs(self) -> Dict[str, ProgramCurriculum]:
         """Parse both AI programs"""
-        return {
-            "ai": self.parse_program("https://abit.itmo.ru/program/master/ai", "AI"),
-            "ai_product": self.parse_program(
-                "https://abit.itmo.ru/program/master/ai_product", "AI Product"
-            ),
-        }
+        return self._run_sync(self.get_all_programs_async())
+
+    async def get_all_programs_async(self) -> Dict[str, ProgramCurriculum]:
+        """Parse both AI programs concurrently on the running event loop"""
+        async with self._make_client() as client:
+            curricula = await asyncio.gather(
+                *(
+                    self.parse_program_async(client, url, name)
+                    for url, name in self.PROGRAMS.values()
+                )
+            )
+        return dict(zip(self.PROGRAMS.keys(), curricula))
@@ -1,5 +1,7 @@
+import asyncio
 import logging
 import os
+import re
 from telegram import Update, ReplyKeyboardMarkup, ReplyKeyboardRemove
 from telegram.ext import (
     Application,
@@ -20,6 +22,25 @@ PROGRAM_MAP = {
     "Продуктовая разработка на основе ИИ": "ai_product",
 }
 
+# Intent table for free-form questions: trigger substring -> intent tag
+INTENT_MAP = {
+    "обязательные": "compulsory",
+    "семестр": "semester",
+    "первый": "semester_1",
+    "первом": "semester_1",
+    "1": "semester_1",
+    "второй": "semester_2",
+    "втором": "semester_2",
+    "2": "semester_2",
+}
+
+# Single alternation over all triggers, so a question is scanned once
+INTENT_RE = re.compile(
+    "|".join(
+        re.escape(trigger) for trigger in sorted(INTENT_MAP, key=len, reverse=True)
+    )
+)
+
 
 class AdmissionBot:
     def __init__(self, curricula: dict, recommender: RecommendationService):
@@ -131,11 +152,17 @@ class AdmissionBot:
 
             # Send each semester's courses in a separate message
             if update.effective_message:
+                messages = []
                 for semester, courses in plan.items():
                     semester_lines = [f"Семестр {semester}:"]
                     for course in courses:
                         semester_lines.append(f"• {course.name} (выборный)")
-                    await update.effective_message.reply_text("\n".join(semester_lines))
+                    messages.append("\n".join(semester_lines))
+
+                # Dispatch concurrently; delivery order across semesters is best-effort
+                await asyncio.gather(
+                    *(update.effective_message.reply_text(text) for text in messages)
+                )
 
             await update.effective_message.reply_text(
                 "Теперь ты можешь задавать вопросы по программе. Например:\n"
@@ -192,17 +219,15 @@ class AdmissionBot:
                 )
             return ConversationHandler.END
 
-        if "обязательные" in question and "семестр" in question:
+        intents = {INTENT_MAP[m.group(0)] for m in INTENT_RE.finditer(question)}
+
+        if "compulsory" in intents and "semester" in intents:
             semester = (
-                1
-                if "первый" in question or "1" in question
-                else 2 if "второй" in question or "2" in question else None
+                1 if "semester_1" in intents else 2 if "semester_2" in intents else None
             )
             if semester:
                 courses = [
-                    c.name
-                    for c in program.courses
-                    if c.semester == semester and c.is_compulsory
+                    c.name for c in program.get_compulsory_courses_by_semester(semester)
                 ]
                 response = (
                     f"Обязательные курсы в {semester} семестре:\n• "